@@ -2,11 +2,14 @@
 
 import chardet
 import copy
+import errno
 import glob
 import os
 import shutil
 import sys
 import tempfile
+import time
+import zipfile
 
 sys.path.append(os.getcwd())  # Handle relative imports
 from pressurecooker import web
@@ -20,7 +23,10 @@ from ricecooker.exceptions import raise_for_invalid_channel
 ###########################################################
 from le_utils.constants import file_formats, format_presets, licenses
 
-from .utils import int_to_roman, js_file_to_json
+from .journal import BuildJournal
+from .size_report import SizeReport
+from .utils import int_to_roman, js_file_to_json, parse_content_ids, parse_int_ids, parse_standards
+from .watcher import ContentWatcher
 
 """ Run Constants"""
 ###########################################################
@@ -44,6 +50,10 @@ CONTENT_ROOT_EN = os.path.join(FILES_DIR, 'ekShiksha', 'ekShikshaEnglish')
 # License to be used for content under channel
 CHANNEL_LICENSE = licenses.CC_BY_NC
 
+# Errors caused by the machine rather than the content item being built. These stop the run, so that it can be
+# resumed from the build journal once they're fixed, instead of marking every remaining item as failed.
+MACHINE_ERRNOS = (errno.ENOSPC, errno.EDQUOT, errno.ENOMEM)
+
 
 """ The chef class that takes care of uploading channel to the content curation server. """
 
@@ -66,11 +76,57 @@ class EkShikshaChef(SushiChef):
     chapters_path_rel = 'chapters'
     temp_dir = tempfile.mkdtemp()
     cache_dir = os.path.join(ROOT_DIR, 'chefdata', channel_info['CHANNEL_SOURCE_ID'])
+    journal_path = os.path.join(cache_dir, 'build_journal.jsonl')
+    size_report_path = os.path.join(cache_dir, 'size_report.json')
+    # Runs restricted to some of the content write here, so they don't overwrite the report for the full channel.
+    partial_size_report_path = os.path.join(cache_dir, 'size_report_partial.json')
+    dep_zip = None
     dep_zip_file = None
+    # Set from ricecooker's --resume flag. When True, items recorded as finished in the build journal are not rebuilt.
+    resume = False
+    # Keys of the content items that could not be zipped in the last call to get_zips_for_content.
+    failed_items = []
     """ Main scraping method """
 
     ###########################################################
 
+    def __init__(self):
+        super(EkShikshaChef, self).__init__()
+        self.arg_parser.add_argument('--standards', type=parse_standards, help='Comma-separated list of standards, '
+                                     'as numbers or roman numerals, to restrict the run to.')
+        self.arg_parser.add_argument('--topics', type=parse_int_ids, help='Comma-separated list of topic ids from '
+                                     'topics.js to restrict the run to. Subtopics of these topics are included.')
+        self.arg_parser.add_argument('--content-ids', type=parse_content_ids, help='Comma-separated list of contentId or '
+                                     'resourceDir values of the content items to restrict the run to.')
+        self.arg_parser.add_argument('--partial-upload', action='store_true', help='Upload the channel even though '
+                                     'it was restricted by --standards, --topics or --content-ids. This replaces the '
+                                     'full channel on Studio with only the selected content.')
+        self.arg_parser.add_argument('--allow-failed-items', action='store_true', help='Upload the channel even if '
+                                     'some content items could not be zipped. Those items are removed from Studio.')
+        self.arg_parser.add_argument('--watch', action='store_true', help='Build the content zips, then keep '
+                                     'watching the content files and rebuild only what changed. Nothing is uploaded.')
+
+    def run(self, args, options):
+        # ricecooker consumes --resume itself and doesn't pass it on to construct_channel, so grab it here.
+        self.resume = args.get('resume', False)
+        if args.get('watch'):
+            kwargs = args.copy()
+            kwargs.update(options)
+            self.watch(**kwargs)
+            return
+        if self.has_content_filters(**args) and not args.get('partial_upload'):
+            # a partial channel would replace the full one on Studio, so only build it locally
+            LOGGER.info("Content filters are active, building the channel without uploading it. "
+                        "Pass --partial-upload to upload it anyway.")
+            kwargs = args.copy()
+            kwargs.update(options)
+            # nothing is uploaded, so failed items only need to be reported
+            kwargs['allow_failed_items'] = True
+            channel = self.construct_channel(**kwargs)
+            raise_for_invalid_channel(channel)
+            return
+        super(EkShikshaChef, self).run(args, options)
+
     def construct_channel(self, *args, **kwargs):
         """ construct_channel: Creates ChannelNode and build topic tree
         """
@@ -83,17 +139,16 @@ class EkShikshaChef(SushiChef):
             print("This chef does not yet support scraping from the ekShiksha web site.")
             sys.exit(1)
 
-        self.create_dependency_zip()
-
-        contents = self.get_content_metadata()
-        info_with_zips = self.get_zips_for_content(contents)
-
-        standards = self.get_contents_by_standard(info_with_zips)
-        standard_keys = list(standards.keys())
-        standard_keys.sort()
+        contents = self.get_selected_content_metadata(**kwargs)
+        info_with_zips = self.get_zips_for_content(contents, selective=self.has_content_filters(**kwargs))
+        if self.failed_items and not kwargs.get('allow_failed_items'):
+            # uploading now would remove the failed items from the channel on Studio
+            raise RuntimeError("{} content items could not be zipped. Fix them and run again with --resume, or pass "
+                               "--allow-failed-items to upload the channel without them.".format(len(self.failed_items)))
 
-        for standard_num in standard_keys:
-            tree = self.get_content_tree(standards[standard_num])
+        trees_by_standard = self.get_trees_by_standard(info_with_zips)
+        for standard_num in sorted(trees_by_standard):
+            tree = trees_by_standard[standard_num]
 
             standard_topic = nodes.TopicNode(source_id='standard' + str(standard_num), title=int_to_roman(standard_num))
 
@@ -103,8 +158,195 @@ class EkShikshaChef(SushiChef):
                 if topic:
                     standard_topic.add_child(topic)
             channel.add_child(standard_topic)
+
+        if self.has_content_filters(**kwargs):
+            self.create_size_report(trees_by_standard, self.partial_size_report_path)
+        else:
+            self.create_size_report(trees_by_standard)
         return channel
 
+    def watch(self, **kwargs):
+        """
+        Build the content zips, then watch the content files and rebuild only the work affected by each batch of
+        changes until interrupted. Accepts the same filter options as construct_channel.
+        """
+        start_time = time.time()
+        # keep the items that fail to build in the list, so they are rebuilt once they're fixed
+        contents = self.get_selected_content_metadata(**kwargs)
+        self.get_zips_for_content(contents, selective=self.has_content_filters(**kwargs))
+        zips_time = time.time() - start_time
+        self.write_watch_size_report(contents, **kwargs)
+        LOGGER.info("Built in {:.1f}s: {} content items {:.1f}s, tree and size report {:.1f}s".format(
+            time.time() - start_time, len(contents), zips_time, time.time() - start_time - zips_time))
+
+        journal = BuildJournal(self.journal_path)
+        chapters_path = os.path.join(self.content_root, self.chapters_path_rel)
+        watcher = ContentWatcher([self.apps_path, chapters_path, self.assets_dir])
+        LOGGER.info("Watching {} for changes. Press Ctrl+C to stop.".format(self.content_root))
+        pending_paths = set()
+        try:
+            while True:
+                changed_paths = pending_paths | watcher.wait_for_changes()
+                try:
+                    contents = self.rebuild_changes(changed_paths, contents, journal, **kwargs)
+                    pending_paths = set()
+                except Exception:
+                    # Files are often in a bad state part way through being edited or saved, e.g. a half-written
+                    # contents.js. Keep watching, and retry these changes together with the next ones.
+                    LOGGER.exception("Unable to rebuild changes, will retry on the next change.")
+                    pending_paths = changed_paths
+        except KeyboardInterrupt:
+            LOGGER.info("Stopped watching.")
+
+    def get_rebuild_plan(self, changed_paths, contents):
+        """
+        Work out what needs rebuilding after files in the content root have changed.
+
+        :param changed_paths: Absolute paths of the changed files.
+        :param contents: List of item metadata dictionaries currently being built.
+        :return: A dictionary saying whether the content metadata, dependency zip and tree need rebuilding, and
+            the list of content items whose zips need rebuilding.
+        """
+        plan = {'metadata': False, 'dep_zip': False, 'tree': False, 'items': []}
+        pie_path_rel = os.path.join(self.apps_path_rel, 'PIE')
+        js_path_rel = os.path.relpath(self.js_dir, self.content_root)
+        for changed_path in changed_paths:
+            path_rel = os.path.relpath(changed_path, self.content_root)
+            # contents.js and topics.js are in assets too, so they also need the dependency zip rebuilt
+            if path_rel == os.path.join(js_path_rel, 'contents.js'):
+                plan['metadata'] = True
+                plan['tree'] = True
+                plan['dep_zip'] = True
+            elif path_rel == os.path.join(js_path_rel, 'topics.js'):
+                plan['tree'] = True
+                plan['dep_zip'] = True
+            elif path_rel.startswith(self.assets_path_rel + os.sep) or path_rel.startswith(pie_path_rel + os.sep):
+                plan['dep_zip'] = True
+            else:
+                for content in contents:
+                    # a directory that was deleted or moved away may be reported as the item's own directory
+                    in_item_dir = path_rel == content['dir'] or path_rel.startswith(content['dir'] + os.sep)
+                    if in_item_dir and content not in plan['items']:
+                        plan['items'].append(content)
+
+        if plan['dep_zip']:
+            for content in contents:
+                if content.get('needs_dep_zip') and content not in plan['items']:
+                    plan['items'].append(content)
+        return plan
+
+    def rebuild_changes(self, changed_paths, contents, journal, **kwargs):
+        """
+        Rebuild the work affected by changed files and log how long each step took.
+
+        :param changed_paths: Absolute paths of the changed files.
+        :param contents: List of item metadata dictionaries currently being built.
+        :param journal: BuildJournal to record rebuilt items in.
+        :return: The updated list of item metadata dictionaries.
+        """
+        start_time = time.time()
+        timings = []
+        plan = self.get_rebuild_plan(changed_paths, contents)
+
+        if plan['metadata']:
+            step_start = time.time()
+            contents, changed_items = self.reload_content_metadata(contents, **kwargs)
+            # plan again so the rebuilds are done on the reloaded items, which replace the old ones
+            plan = self.get_rebuild_plan(changed_paths, contents)
+            for content in changed_items:
+                if content not in plan['items']:
+                    plan['items'].append(content)
+            timings.append("metadata {:.1f}s".format(time.time() - step_start))
+
+        # if no item has needed the dependency zip yet, it will be created when one does
+        if plan['dep_zip'] and self.dep_zip:
+            step_start = time.time()
+            self.dep_zip = None
+            self.get_dependency_zip()
+            timings.append("dependency zip {:.1f}s".format(time.time() - step_start))
+
+        if plan['items']:
+            step_start = time.time()
+            for content in plan['items']:
+                content.pop('html5_zip', None)
+                content.pop('needs_dep_zip', None)
+                self.build_content_zip(content, journal)
+            timings.append("{} content items {:.1f}s".format(len(plan['items']), time.time() - step_start))
+
+        if timings or plan['tree']:
+            step_start = time.time()
+            self.write_watch_size_report(contents, log_tree=plan['tree'], **kwargs)
+            timings.append("tree and size report {:.1f}s".format(time.time() - step_start))
+            LOGGER.info("Rebuilt in {:.1f}s: {}".format(time.time() - start_time, ', '.join(timings)))
+        return contents
+
+    def write_watch_size_report(self, contents, log_tree=False, **kwargs):
+        """
+        Build the topic trees of the content being watched and write the size report for them.
+
+        :param contents: List of item metadata dictionaries currently being built.
+        :param log_tree: Whether to log a summary of the topic trees.
+        """
+        trees_by_standard = self.get_trees_by_standard(contents)
+        if log_tree:
+            self.log_tree_summary(trees_by_standard)
+        if self.has_content_filters(**kwargs):
+            self.create_size_report(trees_by_standard, self.partial_size_report_path)
+        else:
+            self.create_size_report(trees_by_standard)
+
+    def reload_content_metadata(self, contents, **kwargs):
+        """
+        Read the content metadata again after contents.js has changed. Items whose metadata is unchanged keep the
+        zip that was already built for them.
+
+        :param contents: List of item metadata dictionaries currently being built.
+        :return: A tuple of the reloaded list of item metadata dictionaries, and the items from it that are new or
+            whose metadata changed and so need their zip rebuilt.
+        """
+        built = {content['dir']: content for content in contents}
+        new_contents = self.get_selected_content_metadata(**kwargs)
+        changed_items = []
+        for content in new_contents:
+            old_content = built.get(content['dir'])
+            old_metadata = None
+            if old_content:
+                old_metadata = {key: old_content[key] for key in old_content
+                                if key not in ('html5_zip', 'needs_dep_zip')}
+            if old_metadata != content or 'html5_zip' not in old_content:
+                changed_items.append(content)
+                continue
+            content['html5_zip'] = old_content['html5_zip']
+            if old_content.get('needs_dep_zip'):
+                content['needs_dep_zip'] = True
+        return new_contents, changed_items
+
+    def log_tree_summary(self, trees_by_standard):
+        """
+        Log the number of topics and content items in each standard's topic tree, and any topics without content.
+
+        :param trees_by_standard: A dictionary of standard number to the topic tree returned by get_content_tree.
+        """
+        def _count_recursive(topic_info, parent_path, counts):
+            topic_path = '{} > {}'.format(parent_path, topic_info['text'])
+            counts['topics'] += 1
+            counts['items'] += len(topic_info.get('nodes', []))
+            items_before = counts['items']
+            for subtopic in topic_info.get('subtopics', []):
+                _count_recursive(subtopic, topic_path, counts)
+            if not topic_info.get('nodes') and counts['items'] == items_before:
+                counts['empty'].append(topic_path)
+
+        for standard_num in sorted(trees_by_standard):
+            standard_name = int_to_roman(standard_num)
+            counts = {'topics': 0, 'items': 0, 'empty': []}
+            for root_topic in trees_by_standard[standard_num]:
+                _count_recursive(root_topic, standard_name, counts)
+            LOGGER.info("Standard {}: {} topics, {} content items".format(standard_name, counts['topics'],
+                                                                          counts['items']))
+            for topic_path in counts['empty']:
+                LOGGER.warning("Topic has no content: {}".format(topic_path))
+
     def __del__(self):
         self.cleanup()
         assert not os.path.exists(self.temp_dir), "Error cleaning temp directory {}.\nIt may safely be deleted.".format(self.temp_dir)
@@ -206,6 +448,9 @@ class EkShikshaChef(SushiChef):
         """
         pie_subdir = "PIE"
         dep_zip_temp_dir = os.path.join(self.temp_dir, 'dep_zip')
+        # remove the copy from any previous build in this run
+        if os.path.exists(dep_zip_temp_dir):
+            shutil.rmtree(dep_zip_temp_dir)
         os.makedirs(dep_zip_temp_dir)
 
         # Copy over the assets directory'
@@ -229,6 +474,16 @@ class EkShikshaChef(SushiChef):
         self.dep_zip = self.create_zip_from_dir(dep_zip_temp_dir)
         self.dep_zip_file = files.HTMLZipFile(self.dep_zip, preset=format_presets.HTML5_DEPENDENCY_ZIP)
 
+    def get_dependency_zip(self):
+        """
+        Return the path to the dependency zip, creating it the first time a content item needs it.
+
+        :return: Path to the dependency zip file.
+        """
+        if not self.dep_zip:
+            self.create_dependency_zip()
+        return self.dep_zip
+
     def update_html(self, content_info, html_file_path):
         """
         Update HTML content for Kolibri, including changing links to reference files within Kolibri.
@@ -250,12 +505,12 @@ class EkShikshaChef(SushiChef):
         for link in local_links:
             if pie_ref in link:
                 content_info['needs_dep_zip'] = True
-                dep_zip_pie_ref = '{}/PIE/'.format(os.path.basename(self.dep_zip))
+                dep_zip_pie_ref = '{}/PIE/'.format(os.path.basename(self.get_dependency_zip()))
                 links_to_replace[pie_ref] = dep_zip_pie_ref
 
             elif assets_ref in link:
                 content_info['needs_dep_zip'] = True
-                dep_zip_assets_ref = '/zipcontent/{}/assets/'.format(os.path.basename(self.dep_zip))
+                dep_zip_assets_ref = '/zipcontent/{}/assets/'.format(os.path.basename(self.get_dependency_zip()))
                 links_to_replace[assets_ref] = dep_zip_assets_ref
 
             # find and patch any Three.js references in the sources that are not part of the PIE package.
@@ -297,6 +552,9 @@ class EkShikshaChef(SushiChef):
         if 'dir' in content_info:
             # copytree expects to create the dir it's copying itself, so just create the parent directory.
             temp_path = os.path.join(self.temp_dir, content_info['dir'])
+            # remove the copy from any previous build in this run
+            if os.path.exists(temp_path):
+                shutil.rmtree(temp_path)
 
             shutil.copytree(content_info['dir_absolute'], temp_path)
             if content_info['html_file'] != "index.html":
@@ -342,17 +600,173 @@ class EkShikshaChef(SushiChef):
 
         return content_metadata
 
-    def get_zips_for_content(self, contents):
+    def has_content_filters(self, **kwargs):
+        """
+        :return: True if the run is restricted by the --standards, --topics or --content-ids options.
+        """
+        return bool(kwargs.get('standards') or kwargs.get('topics') or kwargs.get('content_ids'))
+
+    def get_selected_content_metadata(self, **kwargs):
+        """
+        Get the metadata of the content items selected by the --standards, --topics and --content-ids options.
+
+        :return: List of item metadata dictionaries.
+        """
+        return self.filter_content_metadata(
+            self.get_content_metadata(),
+            standards=kwargs.get('standards'),
+            topic_ids=kwargs.get('topics'),
+            content_ids=kwargs.get('content_ids')
+        )
+
+    def filter_content_metadata(self, contents, standards=None, topic_ids=None, content_ids=None):
+        """
+        Restrict the content items to build to the ones selected on the command line. An item is kept if it matches
+        every filter that is given.
+
+        :param contents: List of item metadata dictionaries from get_content_metadata.
+        :param standards: List of standards to keep, or None to keep all standards.
+        :param topic_ids: List of topic ids to keep, including all of their subtopics, or None to keep all topics.
+        :param content_ids: List of contentId or resourceDir values to keep, or None to keep all items.
+        :return: List of item metadata dictionaries that match the filters.
+        :raises ValueError: If a topic id is not in topics.js, or no content items match the filters.
+        """
+        if not standards and not topic_ids and not content_ids:
+            return contents
+
+        if standards:
+            standards = set(int(standard) for standard in standards)
+
+        if topic_ids:
+            # include the whole subtree under each selected topic
+            children_by_id = {}
+            known_topic_ids = set()
+            for topic in self.get_topics():
+                known_topic_ids.add(int(topic['id']))
+                if 'parent' in topic and topic['parent'] != '#':
+                    children_by_id.setdefault(int(topic['parent']), []).append(int(topic['id']))
+            unknown_topic_ids = [topic_id for topic_id in topic_ids if int(topic_id) not in known_topic_ids]
+            if unknown_topic_ids:
+                raise ValueError("Topic ids not found in topics.js: {}".format(
+                    ', '.join(str(topic_id) for topic_id in unknown_topic_ids)))
+            selected_topics = set()
+            topics_to_visit = [int(topic_id) for topic_id in topic_ids]
+            while topics_to_visit:
+                topic_id = topics_to_visit.pop()
+                if topic_id not in selected_topics:
+                    selected_topics.add(topic_id)
+                    topics_to_visit.extend(children_by_id.get(topic_id, []))
+
+        if content_ids:
+            content_ids = set(str(content_id) for content_id in content_ids)
+
+        filtered = []
+        for content_info in contents:
+            content = content_info['content_info']
+            if standards and int(content['standard']) not in standards:
+                continue
+            if topic_ids and int(content['topic']['id']) not in selected_topics:
+                continue
+            if content_ids and str(content.get('contentId')) not in content_ids and \
+                    str(content.get('resourceDir')) not in content_ids:
+                continue
+            filtered.append(content_info)
+
+        if not filtered:
+            raise ValueError("No content items match the given standards, topics or content ids.")
+        LOGGER.info("Building {} of {} content items".format(len(filtered), len(contents)))
+        return filtered
+
+    def get_zips_for_content(self, contents, selective=False):
         """
         Convenience function to generate all the HTML5 zip files of all the content.
 
+        Each item is recorded in the build journal as soon as it is finished. If the chef is run with --resume, items
+        the journal lists as finished are restored from it instead of being rebuilt. Items that raise an error are
+        recorded as failed and left out of the returned list, so that one bad item does not stop the build. Their keys
+        are kept in failed_items. Running out of memory or disk space still stops the build.
+
         :param contents: A list of dictionaries with information about content items.
-        :return:
+        :param selective: True if contents is a subset of the channel. The journal is then appended to rather than
+            started over, so that the full build can still be resumed afterwards.
+        :return: The list of content items that have an HTML5 zip.
         """
+        journal = BuildJournal(self.journal_path)
+        finished = {}
+        if self.resume:
+            finished = journal.get_finished_items()
+        elif not selective:
+            journal.reset()
+
+        contents_with_zips = []
+        failed = []
         for content in contents:
+            key = content['dir']
+            if key in finished:
+                entry = finished[key]
+                # links in the zip point at the dependency zip by name, so only reuse it if that zip hasn't changed.
+                dep_zip_unchanged = True
+                if entry['needs_dep_zip']:
+                    dep_zip_unchanged = entry['dep_zip'] == os.path.basename(self.get_dependency_zip())
+                if os.path.exists(entry['html5_zip']) and dep_zip_unchanged:
+                    content['html5_zip'] = entry['html5_zip']
+                    if entry['needs_dep_zip']:
+                        content['needs_dep_zip'] = True
+                    contents_with_zips.append(content)
+                    continue
+
+            if self.build_content_zip(content, journal):
+                contents_with_zips.append(content)
+            else:
+                failed.append(key)
+
+        if failed:
+            LOGGER.warning("Skipped {} content items that could not be zipped:\n{}".format(len(failed), '\n'.join(failed)))
+        self.failed_items = failed
+
+        return contents_with_zips
+
+    def build_content_zip(self, content, journal):
+        """
+        Create the HTML5 zip for a content item and record the result in the build journal.
+
+        :param content: Metadata dictionary of the content item.
+        :param journal: BuildJournal to record the item in.
+        :return: True if the zip was created, False if creating it raised an error.
+        :raises MemoryError, OSError: If the machine ran out of memory or disk space, rather than recording the item
+            as failed.
+        """
+        key = content['dir']
+        try:
             self.get_html5_zip_node_for_content(content)
+        except MemoryError:
+            raise
+        except Exception as e:
+            if isinstance(e, OSError) and e.errno in MACHINE_ERRNOS:
+                raise
+            LOGGER.exception("Unable to create zip for {}".format(key))
+            journal.record_failed(key, repr(e))
+            return False
+
+        if content.get('needs_dep_zip'):
+            journal.record_done(key, content['html5_zip'], True, os.path.basename(self.dep_zip))
+        else:
+            journal.record_done(key, content['html5_zip'])
+        return True
+
+    def get_trees_by_standard(self, contents):
+        """
+        Create a topic tree for each CBSE standard from the content items that have an HTML5 zip.
 
-        return contents
+        :param contents: List of item metadata dictionaries.
+        :return: A dictionary of standard number to the topic tree returned by get_content_tree.
+        """
+        contents_with_zips = [content for content in contents if 'html5_zip' in content]
+        standards = self.get_contents_by_standard(contents_with_zips)
+        trees_by_standard = {}
+        for standard_num in standards:
+            trees_by_standard[standard_num] = self.get_content_tree(standards[standard_num])
+        return trees_by_standard
 
     def get_content_tree(self, contents_info):
         """
@@ -408,6 +822,48 @@ class EkShikshaChef(SushiChef):
                 tree.append(root)
         return tree
 
+    def create_size_report(self, trees_by_standard, output_path=None):
+        """
+        Write a breakdown of the size of the dependency zip and the content zips, and log a summary of it.
+
+        The report is only informational, so errors reading the zips or writing the report are logged as a warning
+        instead of stopping the chef.
+
+        :param trees_by_standard: A dictionary of standard number to the topic tree returned by get_content_tree.
+        :param output_path: Path of the JSON file to write. Defaults to size_report_path.
+        :return: The report dictionary, or None if it could not be created.
+        """
+        if output_path is None:
+            output_path = self.size_report_path
+        try:
+            return self._write_size_report(trees_by_standard, output_path)
+        except (zipfile.BadZipFile, OSError) as e:
+            LOGGER.warning("Unable to create size report: {}".format(e))
+            return None
+
+    def _write_size_report(self, trees_by_standard, output_path):
+        report = SizeReport()
+        if self.dep_zip:
+            report.add_zip(self.dep_zip, standard='dependencies', topic='dependencies')
+
+        def _add_topic_recursive(standard_name, topic_info, parent_path):
+            topic_path = '{} > {}'.format(parent_path, topic_info['text'])
+            for anode in topic_info.get('nodes', []):
+                if 'html5_zip' in anode:
+                    report.add_zip(anode['html5_zip'], standard=standard_name, topic=topic_path)
+            for subtopic in topic_info.get('subtopics', []):
+                _add_topic_recursive(standard_name, subtopic, topic_path)
+
+        for standard_num in trees_by_standard:
+            standard_name = int_to_roman(standard_num)
+            for root_topic in trees_by_standard[standard_num]:
+                _add_topic_recursive(standard_name, root_topic, standard_name)
+
+        size_report = report.get_report()
+        report.write_json(output_path, size_report)
+        LOGGER.info("Size report written to {}\n{}".format(output_path, report.get_summary(size_report)))
+        return size_report
+
     def create_topic_nodes_recursive(self, topic_info):
         """
         Create nodes for all the content items in the tree. Currently supports HTML5 app node and topic node creation.
@@ -0,0 +1,106 @@
+import json
+import os
+
+
+class BuildJournal:
+    """
+    An append-only record of the content items processed during a chef run. Each line of the journal file is a JSON
+    object describing one item, written as soon as that item is finished, so that a run which dies part way through
+    can be resumed without rebuilding the items that were already zipped.
+
+    Later entries for the same key take precedence over earlier ones, so an item that failed in one run and succeeded
+    on resume is reported as finished.
+    """
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+
+    def reset(self):
+        """
+        Start a new, empty journal, discarding the entries from any previous run.
+        """
+        journal_dir = os.path.dirname(self.journal_path)
+        if not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        open(self.journal_path, 'w').close()
+
+    def read(self):
+        """
+        Replay the journal.
+
+        :return: A dictionary mapping each item key to the most recent entry recorded for it.
+        """
+        entries = {}
+        if not os.path.exists(self.journal_path):
+            return entries
+
+        f = open(self.journal_path)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line may be incomplete if the run was killed while writing it.
+                continue
+            entries[entry['key']] = entry
+        f.close()
+        return entries
+
+    def get_finished_items(self):
+        """
+        :return: A dictionary of item key to journal entry for all items whose zip was built successfully.
+        """
+        entries = self.read()
+        return {key: entries[key] for key in entries if entries[key]['status'] == self.STATUS_DONE}
+
+    def get_failed_items(self):
+        """
+        :return: A dictionary of item key to journal entry for all items that could not be built.
+        """
+        entries = self.read()
+        return {key: entries[key] for key in entries if entries[key]['status'] == self.STATUS_FAILED}
+
+    def record_done(self, key, zip_path, needs_dep_zip=False, dep_zip=None):
+        """
+        Record that the zip for an item has been built.
+
+        :param key: Unique key of the content item.
+        :param zip_path: Path to the item's HTML5 zip file.
+        :param needs_dep_zip: Whether the item references files in the dependency zip.
+        :param dep_zip: Filename of the dependency zip the item's links were rewritten to point at.
+        """
+        self._append({
+            'key': key,
+            'status': self.STATUS_DONE,
+            'html5_zip': zip_path,
+            'needs_dep_zip': needs_dep_zip,
+            'dep_zip': dep_zip,
+        })
+
+    def record_failed(self, key, error):
+        """
+        Record that building the zip for an item raised an error.
+
+        :param key: Unique key of the content item.
+        :param error: Description of the error.
+        """
+        self._append({
+            'key': key,
+            'status': self.STATUS_FAILED,
+            'error': error,
+        })
+
+    def _append(self, entry):
+        journal_dir = os.path.dirname(self.journal_path)
+        if not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        f = open(self.journal_path, 'a')
+        f.write(json.dumps(entry) + '\n')
+        # make sure the entry is on disk before moving to the next item, in case the process is killed
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
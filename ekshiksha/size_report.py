@@ -0,0 +1,213 @@
+import json
+import os
+import zipfile
+
+
+class SizeReport:
+    """
+    Breaks down the size of the built zip files to find out what is taking up space in the channel.
+
+    Only the central directory of each zip is read, so building the report is cheap even for large channels. Because
+    the files are never decompressed, identical files are detected by their CRC-32 and uncompressed size as stored
+    in the central directory rather than by a full content hash.
+
+    Sizes by topic and standard are counted once for every content item that uses a zip, while the sizes by extension
+    and by content hash are counted once per unique zip file.
+    """
+    def __init__(self, top_n=20):
+        self.top_n = top_n
+        self.zip_files = {}
+        self.by_standard = {}
+        self.by_topic = {}
+
+    def add_zip(self, zip_path, standard=None, topic=None):
+        """
+        Add a zip file to the report.
+
+        :param zip_path: Path to the zip file.
+        :param standard: Name of the standard the zip belongs to, if any.
+        :param topic: Path of the topic the zip belongs to, if any.
+        """
+        if zip_path not in self.zip_files:
+            self.zip_files[zip_path] = self.get_zip_entries(zip_path)
+        compressed, uncompressed = self._sum_sizes(self.zip_files[zip_path])
+
+        if standard is not None:
+            self._add_sizes(self.by_standard, standard, compressed, uncompressed)
+        if topic is not None:
+            self._add_sizes(self.by_topic, topic, compressed, uncompressed)
+
+    def get_zip_entries(self, zip_path):
+        """
+        Read the file entries from the central directory of a zip file.
+
+        :param zip_path: Path to the zip file.
+        :return: A list of dictionaries with the name, sizes and content hash of each file in the zip.
+        """
+        entries = []
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in zf.infolist():
+                if info.filename.endswith('/'):
+                    continue
+                entries.append({
+                    'name': info.filename,
+                    'compressed': info.compress_size,
+                    'uncompressed': info.file_size,
+                    'hash': '{:08x}-{}'.format(info.CRC, info.file_size),
+                })
+        return entries
+
+    def get_report(self):
+        """
+        :return: A dictionary with the full size breakdown, suitable for serializing to JSON.
+        """
+        by_extension = {}
+        by_hash = {}
+        all_files = []
+        for zip_path in self.zip_files:
+            for entry in self.zip_files[zip_path]:
+                ext = os.path.splitext(entry['name'])[1].lower() or '(none)'
+                self._add_sizes(by_extension, ext, entry['compressed'], entry['uncompressed'])
+
+                if not entry['hash'] in by_hash:
+                    by_hash[entry['hash']] = {'compressed': 0, 'uncompressed': 0, 'count': 0, 'files': [],
+                                              'smallest_compressed': entry['compressed']}
+                file_hash = by_hash[entry['hash']]
+                file_hash['smallest_compressed'] = min(file_hash['smallest_compressed'], entry['compressed'])
+                file_hash['compressed'] += entry['compressed']
+                file_hash['uncompressed'] += entry['uncompressed']
+                file_hash['count'] += 1
+                file_hash['files'].append({'zip': os.path.basename(zip_path), 'name': entry['name']})
+
+                all_files.append({
+                    'zip': os.path.basename(zip_path),
+                    'name': entry['name'],
+                    'compressed': entry['compressed'],
+                    'uncompressed': entry['uncompressed'],
+                })
+
+        duplicates = []
+        for file_hash_key in by_hash:
+            file_hash = by_hash[file_hash_key]
+            zips = set(afile['zip'] for afile in file_hash['files'])
+            if len(zips) < 2:
+                continue
+            # every copy but the smallest one is wasted space
+            duplicates.append({
+                'hash': file_hash_key,
+                'zip_count': len(zips),
+                'copies': file_hash['count'],
+                'wasted_compressed': file_hash['compressed'] - file_hash['smallest_compressed'],
+                'wasted_uncompressed': file_hash['uncompressed'] - file_hash['uncompressed'] // file_hash['count'],
+                'files': file_hash['files'],
+            })
+        duplicates.sort(key=lambda dupe: (dupe['zip_count'], dupe['wasted_compressed']), reverse=True)
+
+        all_files.sort(key=lambda afile: afile['uncompressed'], reverse=True)
+
+        compressed, uncompressed = self._sum_sizes(all_files)
+        return {
+            'total': {
+                'zips': len(self.zip_files),
+                'files': len(all_files),
+                'compressed': compressed,
+                'uncompressed': uncompressed,
+                'wasted_compressed': sum(dupe['wasted_compressed'] for dupe in duplicates),
+                'wasted_uncompressed': sum(dupe['wasted_uncompressed'] for dupe in duplicates),
+            },
+            'by_extension': by_extension,
+            'by_standard': self.by_standard,
+            'by_topic': self.by_topic,
+            'by_hash': by_hash,
+            'largest_files': all_files[:self.top_n],
+            'duplicates': duplicates[:self.top_n],
+        }
+
+    def write_json(self, output_path, report=None):
+        """
+        Write the report to a JSON file.
+
+        :param output_path: Path of the JSON file to write.
+        :param report: A report returned by get_report. If not given, a new one is generated.
+        """
+        if report is None:
+            report = self.get_report()
+        output_dir = os.path.dirname(output_path)
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        f = open(output_path, 'w')
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.close()
+
+    def get_summary(self, report=None):
+        """
+        Create a human readable summary of the report.
+
+        :param report: A report returned by get_report. If not given, a new one is generated.
+        :return: The summary as a string.
+        """
+        if report is None:
+            report = self.get_report()
+
+        total = report['total']
+        lines = [
+            "{} zips, {} files, {} compressed ({} uncompressed)".format(
+                total['zips'], total['files'], format_size(total['compressed']), format_size(total['uncompressed'])),
+            "Wasted on files duplicated across zips: {} compressed ({} uncompressed)".format(
+                format_size(total['wasted_compressed']), format_size(total['wasted_uncompressed'])),
+        ]
+
+        for title, key in [('By extension', 'by_extension'), ('By standard', 'by_standard'), ('By topic', 'by_topic')]:
+            sizes = report[key]
+            if not sizes:
+                continue
+            lines.append('')
+            lines.append('{}:'.format(title))
+            names = sorted(sizes, key=lambda name: sizes[name]['compressed'], reverse=True)
+            for name in names[:self.top_n]:
+                lines.append("  {:>10}  {:>10}  {}".format(
+                    format_size(sizes[name]['compressed']), format_size(sizes[name]['uncompressed']), name))
+
+        if report['largest_files']:
+            lines.append('')
+            lines.append('Largest files (uncompressed):')
+            for afile in report['largest_files']:
+                lines.append("  {:>10}  {}/{}".format(format_size(afile['uncompressed']), afile['zip'], afile['name']))
+
+        if report['duplicates']:
+            lines.append('')
+            lines.append('Most duplicated files:')
+            for dupe in report['duplicates']:
+                lines.append("  {:>4} zips  {:>10} wasted  {}".format(
+                    dupe['zip_count'], format_size(dupe['wasted_compressed']), dupe['files'][0]['name']))
+
+        return '\n'.join(lines)
+
+    def _sum_sizes(self, entries):
+        compressed = sum(entry['compressed'] for entry in entries)
+        uncompressed = sum(entry['uncompressed'] for entry in entries)
+        return compressed, uncompressed
+
+    def _add_sizes(self, sizes, key, compressed, uncompressed):
+        if not key in sizes:
+            sizes[key] = {'compressed': 0, 'uncompressed': 0, 'count': 0}
+        sizes[key]['compressed'] += compressed
+        sizes[key]['uncompressed'] += uncompressed
+        sizes[key]['count'] += 1
+
+
+def format_size(num_bytes):
+    """
+    Formats a number of bytes as a human readable string.
+
+    :param num_bytes: Number of bytes.
+    :return: Size string, e.g. '1.5 MB'
+    """
+    size = float(num_bytes)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            break
+        size /= 1024
+    if unit == 'B':
+        return '{} B'.format(num_bytes)
+    return '{:.1f} {}'.format(size, unit)
@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 
@@ -32,6 +33,24 @@ def int_to_roman(number):
     return result
 
 
+def roman_to_int(roman_text):
+    """
+    Converts a roman numeral into a decimal number.
+
+    :param roman_text: Roman numeral string, e.g. 'VI'. Case-insensitive.
+    :return: Integer number.
+    """
+    roman_text = roman_text.upper()
+    result = 0
+    for (arabic, roman) in ROMAN:
+        while roman_text.startswith(roman):
+            result += arabic
+            roman_text = roman_text[len(roman):]
+    if roman_text or result == 0:
+        raise ValueError("Invalid roman numeral")
+    return result
+
+
 def js_to_json(js_text):
     """
     Takes a JS file in the form of 'var objectName = {...};' and converts it into a dictionary
@@ -52,3 +71,63 @@ def js_to_json(js_text):
 
 def js_file_to_json(js_filename):
     return js_to_json(open(js_filename).read())
+
+
+def split_ids(ids_text):
+    """
+    Splits a comma-separated list of ids passed on the command line.
+
+    :param ids_text: String such as '6,7, 8', or None.
+    :return: A list of id strings, or None if no ids were given.
+    """
+    if not ids_text:
+        return None
+    return [an_id.strip() for an_id in ids_text.split(',') if an_id.strip()]
+
+
+def parse_standards(standards_text):
+    """
+    argparse type for a comma-separated list of standards, given as numbers or roman numerals.
+
+    :param standards_text: String such as '6,VII'.
+    :return: A list of standard numbers.
+    """
+    standards = []
+    for standard in split_ids(standards_text) or []:
+        try:
+            standards.append(int(standard) if standard.isdigit() else roman_to_int(standard))
+        except ValueError:
+            raise argparse.ArgumentTypeError("'{}' is not a standard number or roman numeral".format(standard))
+    if not standards:
+        raise argparse.ArgumentTypeError("no standards given")
+    return standards
+
+
+def parse_int_ids(ids_text):
+    """
+    argparse type for a comma-separated list of numeric ids.
+
+    :param ids_text: String such as '12,15'.
+    :return: A list of integer ids.
+    """
+    ids = []
+    for an_id in split_ids(ids_text) or []:
+        if not an_id.isdigit():
+            raise argparse.ArgumentTypeError("'{}' is not a numeric id".format(an_id))
+        ids.append(int(an_id))
+    if not ids:
+        raise argparse.ArgumentTypeError("no ids given")
+    return ids
+
+
+def parse_content_ids(ids_text):
+    """
+    argparse type for a comma-separated list of contentId or resourceDir values.
+
+    :param ids_text: String such as '1234,someResourceDir'.
+    :return: A list of id strings.
+    """
+    ids = split_ids(ids_text)
+    if not ids:
+        raise argparse.ArgumentTypeError("no ids given")
+    return ids
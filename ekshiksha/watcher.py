@@ -0,0 +1,162 @@
+import os
+import time
+
+from ricecooker.config import LOGGER
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+class ContentWatcher:
+    """
+    Watches directories for changed files and reports them in batches, so that a burst of saves (e.g. an editor
+    writing several files of a chapter) results in a single rebuild.
+
+    Uses inotify through the optional inotify_simple package when it is installed, and otherwise falls back to
+    polling file modification times. It also falls back to polling if inotify can't watch the whole tree, e.g. when
+    the fs.inotify.max_user_watches limit is reached.
+    """
+    def __init__(self, paths, batch_delay=1.0, poll_interval=2.0, use_inotify=True):
+        """
+        :param paths: List of directories or files to watch. Directories are watched recursively.
+        :param batch_delay: Seconds to wait after the first change for more changes before reporting them.
+        :param poll_interval: Seconds between scans when polling.
+        :param use_inotify: Whether to use inotify if it is available.
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.batch_delay = batch_delay
+        self.poll_interval = poll_interval
+        self.inotify = None
+        self.watch_dirs = {}
+        self.snapshot = {}
+
+        if use_inotify and INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.watch_flags = flags.CLOSE_WRITE | flags.CREATE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+                for path in self.paths:
+                    if os.path.isdir(path):
+                        self._add_inotify_watches(path)
+                    else:
+                        self._add_inotify_watch(os.path.dirname(path))
+            except OSError as e:
+                self._fall_back_to_polling(e)
+        if not self.inotify:
+            self.snapshot = self.get_snapshot()
+
+    def wait_for_changes(self):
+        """
+        Block until files under the watched paths change.
+
+        :return: A set of absolute paths of the files that were changed, created or deleted. With inotify, a directory
+            that was deleted or moved away is reported by its own path, as the files in it are no longer known.
+        """
+        while True:
+            if self.inotify:
+                try:
+                    changes = self._read_inotify_changes()
+                except OSError as e:
+                    # e.g. new directories pushed us over the watch limit. Changes made since the last batch
+                    # may be missed, so report the whole tree as changed.
+                    self._fall_back_to_polling(e)
+                    self.snapshot = self.get_snapshot()
+                    changes = set(self.snapshot.keys())
+            else:
+                changes = self._poll_changes()
+            if changes:
+                return changes
+
+    def get_snapshot(self):
+        """
+        :return: A dictionary of the modification time of every file under the watched paths.
+        """
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                snapshot[path] = os.stat(path).st_mtime
+                continue
+            for root, dirnames, filenames in os.walk(path):
+                for filename in filenames:
+                    file_path = os.path.join(root, filename)
+                    try:
+                        snapshot[file_path] = os.stat(file_path).st_mtime
+                    except OSError:
+                        # the file was removed while we were scanning
+                        pass
+        return snapshot
+
+    def is_watched(self, file_path):
+        for path in self.paths:
+            if file_path == path or file_path.startswith(path + os.sep):
+                return True
+        return False
+
+    def _poll_changes(self):
+        time.sleep(self.poll_interval)
+        new_snapshot = self.get_snapshot()
+        changes = self._diff_snapshot(new_snapshot)
+        if changes:
+            # keep collecting until the files settle
+            time.sleep(self.batch_delay)
+            new_snapshot = self.get_snapshot()
+            changes.update(self._diff_snapshot(new_snapshot))
+        self.snapshot = new_snapshot
+        return changes
+
+    def _diff_snapshot(self, new_snapshot):
+        changes = set()
+        for file_path in new_snapshot:
+            if self.snapshot.get(file_path) != new_snapshot[file_path]:
+                changes.add(file_path)
+        for file_path in self.snapshot:
+            if file_path not in new_snapshot:
+                changes.add(file_path)
+        return changes
+
+    def _read_inotify_changes(self):
+        changes = set()
+        # read_delay makes inotify_simple wait for further events once the first one arrives
+        for event in self.inotify.read(read_delay=int(self.batch_delay * 1000)):
+            if event.wd not in self.watch_dirs:
+                continue
+            file_path = os.path.join(self.watch_dirs[event.wd], event.name)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO) and self.is_watched(file_path):
+                    self._add_inotify_watches(file_path)
+                    for root, dirnames, filenames in os.walk(file_path):
+                        changes.update(os.path.join(root, filename) for filename in filenames)
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    self._remove_inotify_watches(file_path)
+                    if self.is_watched(file_path):
+                        changes.add(file_path)
+                continue
+            if self.is_watched(file_path):
+                changes.add(file_path)
+        return changes
+
+    def _fall_back_to_polling(self, error):
+        LOGGER.warning("Unable to watch for changes with inotify ({}), polling for changes instead.".format(error))
+        if self.inotify:
+            self.inotify.close()
+        self.inotify = None
+        self.watch_dirs = {}
+
+    def _add_inotify_watches(self, dir_path):
+        for root, dirnames, filenames in os.walk(dir_path):
+            self._add_inotify_watch(root)
+
+    def _remove_inotify_watches(self, dir_path):
+        for wd, watch_dir in list(self.watch_dirs.items()):
+            if watch_dir == dir_path or watch_dir.startswith(dir_path + os.sep):
+                del self.watch_dirs[wd]
+                try:
+                    self.inotify.rm_watch(wd)
+                except OSError:
+                    # the kernel already removes the watches of deleted directories
+                    pass
+
+    def _add_inotify_watch(self, dir_path):
+        wd = self.inotify.add_watch(dir_path, self.watch_flags)
+        self.watch_dirs[wd] = dir_path
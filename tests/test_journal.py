@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ekshiksha.journal import BuildJournal
+
+
+class BuildJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal = BuildJournal(os.path.join(self.temp_dir, 'chefdata', 'build_journal.jsonl'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_record_and_replay(self):
+        self.journal.reset()
+        self.journal.record_done('apps/one', '/zips/one.zip', needs_dep_zip=True, dep_zip='dep.zip')
+        self.journal.record_failed('chapters/2', 'ValueError()')
+
+        finished = self.journal.get_finished_items()
+        assert list(finished.keys()) == ['apps/one']
+        assert finished['apps/one']['html5_zip'] == '/zips/one.zip'
+        assert finished['apps/one']['needs_dep_zip'] is True
+        assert finished['apps/one']['dep_zip'] == 'dep.zip'
+
+        failed = self.journal.get_failed_items()
+        assert list(failed.keys()) == ['chapters/2']
+
+    def test_later_entries_win(self):
+        self.journal.record_failed('chapters/2', 'ValueError()')
+        self.journal.record_done('chapters/2', '/zips/two.zip')
+
+        assert 'chapters/2' in self.journal.get_finished_items()
+        assert len(self.journal.get_failed_items()) == 0
+
+    def test_reset(self):
+        self.journal.record_done('apps/one', '/zips/one.zip')
+        self.journal.reset()
+
+        assert self.journal.read() == {}
+
+    def test_truncated_entry_is_ignored(self):
+        self.journal.record_done('apps/one', '/zips/one.zip')
+        f = open(self.journal.journal_path, 'a')
+        f.write('{"key": "apps/tw')
+        f.close()
+
+        assert list(self.journal.read().keys()) == ['apps/one']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from ekshiksha import size_report
+
+
+class SizeReportTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_zip(self, name, zip_files):
+        zip_path = os.path.join(self.temp_dir, name)
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for filename in zip_files:
+                zf.writestr(filename, zip_files[filename])
+        return zip_path
+
+    def test_get_report(self):
+        three_js = 'var THREE = {};' * 100
+        dep_zip = self.create_zip('dep.zip', {'index.html': '', 'assets/js/topics.js': 'var topics = [];'})
+        zip_one = self.create_zip('one.zip', {'index.html': '<html></html>', 'three.js': three_js})
+        zip_two = self.create_zip('two.zip', {'index.html': '<html><body></body></html>', 'lib/three.js': three_js})
+
+        report = size_report.SizeReport()
+        report.add_zip(dep_zip, standard='dependencies', topic='dependencies')
+        report.add_zip(zip_one, standard='VI', topic='VI > Science')
+        report.add_zip(zip_two, standard='VI', topic='VI > Science > Light')
+        # a zip shared by two items is counted for both topics but its files only once
+        report.add_zip(zip_two, standard='VII', topic='VII > Science')
+        result = report.get_report()
+
+        assert result['total']['zips'] == 3
+        assert result['total']['files'] == 6
+        assert result['by_extension']['.js']['uncompressed'] == len(three_js) * 2 + len('var topics = [];')
+        assert result['by_standard']['VI']['count'] == 2
+        assert result['by_standard']['VII']['count'] == 1
+        assert 'VI > Science > Light' in result['by_topic']
+
+        assert result['largest_files'][0]['uncompressed'] == len(three_js)
+        assert len(result['duplicates']) == 1
+        dupe = result['duplicates'][0]
+        assert dupe['zip_count'] == 2
+        assert dupe['wasted_uncompressed'] == len(three_js)
+        assert result['total']['wasted_uncompressed'] == len(three_js)
+
+        output_path = os.path.join(self.temp_dir, 'report', 'size_report.json')
+        report.write_json(output_path, result)
+        assert json.load(open(output_path))['total'] == result['total']
+
+        summary = report.get_summary(result)
+        assert 'Most duplicated files:' in summary
+
+    def test_format_size(self):
+        assert size_report.format_size(512) == '512 B'
+        assert size_report.format_size(1536) == '1.5 KB'
+        assert size_report.format_size(3 * 1024 * 1024) == '3.0 MB'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
+import argparse
+import errno
 import json
 import os
+import shutil
+import tempfile
 import unittest
 
 import pytest
 
 from ekshiksha import chef, utils
+from ekshiksha.journal import BuildJournal
 
 
 class EKShikshaChefTest(unittest.TestCase):
@@ -25,6 +30,38 @@ class EKShikshaChefTest(unittest.TestCase):
         assert myvar['sub_dict']['number_one'] == 1
         assert myvar['sub_dict']['truedat'] is True
 
+    def test_split_ids(self):
+        assert utils.split_ids(None) is None
+        assert utils.split_ids('') is None
+        assert utils.split_ids('6') == ['6']
+        assert utils.split_ids('6, 7,,8') == ['6', '7', '8']
+
+    def test_roman_to_int(self):
+        for number in range(1, 40):
+            assert utils.roman_to_int(utils.int_to_roman(number)) == number
+        assert utils.roman_to_int('vi') == 6
+        with pytest.raises(ValueError):
+            utils.roman_to_int('VIB')
+
+    def test_parse_standards(self):
+        assert utils.parse_standards('6, VII,viii') == [6, 7, 8]
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.parse_standards('sixth')
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.parse_standards(',')
+
+    def test_parse_int_ids(self):
+        assert utils.parse_int_ids('12, 15') == [12, 15]
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.parse_int_ids('12,abc')
+
+    def test_parse_content_ids(self):
+        assert utils.parse_content_ids('1234, someResourceDir') == ['1234', 'someResourceDir']
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.parse_content_ids('')
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.parse_content_ids(',')
+
     def test_get_contents(self):
         contents = self.chef.get_contents()
 
@@ -87,6 +124,171 @@ class EKShikshaChefTest(unittest.TestCase):
             standard_trees[standard] = self.chef.get_content_tree(standards[standard])
             assert len(standard_trees[standard]) > 0
 
+    def test_filter_content_metadata(self):
+        contents = self.chef.get_content_metadata()
+        assert self.chef.filter_content_metadata(contents) == contents
+
+        standard = int(contents[0]['content_info']['standard'])
+        filtered = self.chef.get_contents_by_standard(
+            self.chef.filter_content_metadata(contents, standards=[standard]))
+        assert list(filtered.keys()) == [standard]
+
+        root_topic = self.chef.get_content_tree(contents)[0]
+        filtered = self.chef.filter_content_metadata(contents, topic_ids=[int(root_topic['id'])])
+        tree = self.chef.get_content_tree(filtered)
+        assert len(tree) == 1
+        assert tree[0]['id'] == root_topic['id']
+
+        content = contents[0]['content_info']
+        content_id = content.get('contentId', content.get('resourceDir'))
+        filtered = self.chef.filter_content_metadata(contents, content_ids=[str(content_id)])
+        assert contents[0] in filtered
+        assert len(filtered) < len(contents)
+
+        with pytest.raises(ValueError):
+            self.chef.filter_content_metadata(contents, content_ids=['no-such-content'])
+        with pytest.raises(ValueError):
+            self.chef.filter_content_metadata(contents, topic_ids=[int(root_topic['id']), 99999999])
+
+    def test_get_rebuild_plan(self):
+        contents = self.chef.get_content_metadata()
+        content = contents[0]
+        content['needs_dep_zip'] = True
+
+        changed_file = os.path.join(content['dir_absolute'], content['html_file'])
+        plan = self.chef.get_rebuild_plan([changed_file], contents)
+        assert plan['items'] == [content]
+        assert not plan['dep_zip'] and not plan['tree'] and not plan['metadata']
+
+        plan = self.chef.get_rebuild_plan([os.path.join(self.chef.apps_path, 'PIE', 'three.js')], contents)
+        assert plan['dep_zip']
+        assert plan['items'] == [content]
+
+        # topics.js is part of the dependency zip as well
+        plan = self.chef.get_rebuild_plan([os.path.join(self.chef.js_dir, 'topics.js')], contents)
+        assert plan['tree'] and plan['dep_zip']
+        assert plan['items'] == [content]
+
+        # a directory that was moved out of the item's directory
+        plan = self.chef.get_rebuild_plan([os.path.join(content['dir_absolute'], 'images')], contents)
+        assert plan['items'] == [content]
+
+    def test_reload_content_metadata(self):
+        old_contents = [
+            {'dir': 'chapters/1', 'html_file': 'a.html', 'html5_zip': '/zips/1.zip'},
+            {'dir': 'chapters/2', 'html_file': 'b.html', 'html5_zip': '/zips/2.zip'},
+            {'dir': 'apps/three', 'html_file': 'index.html', 'html5_zip': '/zips/3.zip', 'needs_dep_zip': True},
+            {'dir': 'chapters/4', 'html_file': 'd.html'},
+        ]
+        new_contents = [
+            {'dir': 'chapters/1', 'html_file': 'a.html'},
+            {'dir': 'chapters/2', 'html_file': 'c.html'},
+            {'dir': 'apps/three', 'html_file': 'index.html'},
+            {'dir': 'chapters/4', 'html_file': 'd.html'},
+            {'dir': 'chapters/5', 'html_file': 'e.html'},
+        ]
+        self.chef.get_selected_content_metadata = lambda **kwargs: new_contents
+
+        contents, changed_items = self.chef.reload_content_metadata(old_contents)
+
+        assert contents is new_contents
+        # unchanged items keep their zip
+        assert contents[0]['html5_zip'] == '/zips/1.zip'
+        assert contents[2]['html5_zip'] == '/zips/3.zip'
+        assert contents[2]['needs_dep_zip'] is True
+        # changed items, items that had no zip yet and new items are rebuilt
+        assert [content['dir'] for content in changed_items] == ['chapters/2', 'chapters/4', 'chapters/5']
+        assert 'html5_zip' not in contents[1]
+
+    def stub_content_zips(self, failing_keys=()):
+        """
+        Replace zip creation with a stub that writes an empty zip file for each item, or raises for failing_keys.
+        :return: A list of the keys of the items the stub was called for.
+        """
+        zip_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, zip_dir)
+        built = []
+
+        def _create_zip(content_info):
+            built.append(content_info['dir'])
+            if content_info['dir'] in failing_keys:
+                raise ValueError('Bad HTML in {}'.format(content_info['dir']))
+            content_info['html5_zip'] = os.path.join(zip_dir, '{}.zip'.format(len(built)))
+            open(content_info['html5_zip'], 'w').close()
+            if content_info['dir'].startswith('apps'):
+                content_info['needs_dep_zip'] = True
+
+        self.chef.get_html5_zip_node_for_content = _create_zip
+        return built
+
+    def use_temp_journal(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        self.chef.journal_path = os.path.join(journal_dir, 'build_journal.jsonl')
+        # the dependency zip is only referenced by name, so it doesn't need to exist
+        self.chef.dep_zip = os.path.join(journal_dir, 'dep.zip')
+        return BuildJournal(self.chef.journal_path)
+
+    def test_get_zips_for_content_skips_failed_items(self):
+        journal = self.use_temp_journal()
+        contents = [{'dir': 'chapters/1'}, {'dir': 'chapters/2'}, {'dir': 'apps/three'}]
+        built = self.stub_content_zips(failing_keys=['chapters/2'])
+
+        info_with_zips = self.chef.get_zips_for_content(contents)
+
+        assert built == ['chapters/1', 'chapters/2', 'apps/three']
+        assert [content['dir'] for content in info_with_zips] == ['chapters/1', 'apps/three']
+        assert self.chef.failed_items == ['chapters/2']
+        assert list(journal.get_failed_items().keys()) == ['chapters/2']
+        finished = journal.get_finished_items()
+        assert sorted(finished.keys()) == ['apps/three', 'chapters/1']
+        assert finished['apps/three']['needs_dep_zip'] is True
+        assert finished['apps/three']['dep_zip'] == 'dep.zip'
+
+    def test_get_zips_for_content_stops_on_machine_errors(self):
+        self.use_temp_journal()
+
+        def _create_zip(content_info):
+            raise OSError(errno.ENOSPC, 'No space left on device')
+        self.chef.get_html5_zip_node_for_content = _create_zip
+
+        with pytest.raises(OSError):
+            self.chef.get_zips_for_content([{'dir': 'chapters/1'}])
+
+    def test_get_zips_for_content_resume(self):
+        journal = self.use_temp_journal()
+        contents = [{'dir': 'chapters/1'}, {'dir': 'chapters/2'}, {'dir': 'apps/three'}]
+        self.stub_content_zips(failing_keys=['chapters/2'])
+        self.chef.get_zips_for_content(contents)
+        first_zips = {key: entry['html5_zip'] for key, entry in journal.get_finished_items().items()}
+
+        self.chef.resume = True
+        built = self.stub_content_zips()
+        contents = [{'dir': 'chapters/1'}, {'dir': 'chapters/2'}, {'dir': 'apps/three'}]
+        info_with_zips = self.chef.get_zips_for_content(contents)
+
+        # only the item that failed is built again
+        assert built == ['chapters/2']
+        assert len(info_with_zips) == 3
+        assert contents[0]['html5_zip'] == first_zips['chapters/1']
+        assert contents[2]['html5_zip'] == first_zips['apps/three']
+        assert contents[2]['needs_dep_zip'] is True
+        assert self.chef.failed_items == []
+
+    def test_get_zips_for_content_resume_with_new_dep_zip(self):
+        self.use_temp_journal()
+        contents = [{'dir': 'chapters/1'}, {'dir': 'apps/three'}]
+        self.stub_content_zips()
+        self.chef.get_zips_for_content(contents)
+
+        # the journaled zip links to the old dependency zip by name, so it has to be rebuilt
+        self.chef.resume = True
+        self.chef.dep_zip = self.chef.dep_zip.replace('dep.zip', 'new_dep.zip')
+        built = self.stub_content_zips()
+        self.chef.get_zips_for_content([{'dir': 'chapters/1'}, {'dir': 'apps/three'}])
+
+        assert built == ['apps/three']
+
     def test_create_dependency_zip(self):
         self.chef.create_dependency_zip()
 
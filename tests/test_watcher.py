@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+from ekshiksha import watcher
+from ekshiksha.watcher import ContentWatcher
+
+InotifyEvent = namedtuple('InotifyEvent', ['wd', 'mask', 'cookie', 'name'])
+
+
+class FakeFlags:
+    """
+    The inotify flag values used by the watcher, so the tests can run without inotify_simple installed.
+    """
+    CLOSE_WRITE = 0x8
+    MOVED_FROM = 0x40
+    MOVED_TO = 0x80
+    CREATE = 0x100
+    DELETE = 0x200
+    ISDIR = 0x40000000
+
+
+class ContentWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.chapter_dir = os.path.join(self.temp_dir, 'chapters', '1')
+        os.makedirs(self.chapter_dir)
+        self.write_file(os.path.join(self.chapter_dir, 'index.html'), '<html></html>')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, path, text):
+        f = open(path, 'w')
+        f.write(text)
+        f.close()
+
+    def check_batched_changes(self, watcher):
+        index_file = os.path.join(self.chapter_dir, 'index.html')
+        new_file = os.path.join(self.chapter_dir, 'images', 'new.png')
+
+        def _edit_files():
+            time.sleep(0.2)
+            # make sure the modification time changes even on filesystems with coarse timestamps
+            os.utime(index_file, (time.time() + 10, time.time() + 10))
+            self.write_file(index_file, '<html><body></body></html>')
+            os.makedirs(os.path.dirname(new_file))
+            self.write_file(new_file, 'png')
+
+        editor = threading.Thread(target=_edit_files)
+        editor.start()
+        changes = watcher.wait_for_changes()
+        editor.join()
+
+        assert index_file in changes
+        assert new_file in changes
+
+    def test_polling(self):
+        watcher = ContentWatcher([self.temp_dir], batch_delay=0.5, poll_interval=0.1, use_inotify=False)
+        self.check_batched_changes(watcher)
+
+    def test_inotify(self):
+        watcher = ContentWatcher([self.temp_dir], batch_delay=0.5)
+        if not watcher.inotify:
+            self.skipTest('inotify_simple is not installed')
+        self.check_batched_changes(watcher)
+
+    def create_mocked_inotify_watcher(self, events):
+        """
+        Create a watcher using a mocked inotify that returns the given events.
+
+        :param events: A list of functions that take the watcher and return the events of one read from inotify.
+        """
+        inotify = mock.Mock()
+        inotify.add_watch.side_effect = range(1, 100)
+        inotify.read.side_effect = lambda read_delay: events.pop(0)(content_watcher)
+        with mock.patch.object(watcher, 'INotify', return_value=inotify):
+            content_watcher = ContentWatcher([self.temp_dir])
+        return content_watcher
+
+    def get_wd(self, content_watcher, dir_path):
+        for wd in content_watcher.watch_dirs:
+            if content_watcher.watch_dirs[wd] == dir_path:
+                return wd
+
+    def test_inotify_directory_removed(self):
+        images_dir = os.path.join(self.chapter_dir, 'images')
+        os.makedirs(os.path.join(images_dir, 'small'))
+        events = [
+            lambda cw: [InotifyEvent(self.get_wd(cw, self.chapter_dir), FakeFlags.MOVED_FROM | FakeFlags.ISDIR, 1,
+                                     'images')],
+            lambda cw: [InotifyEvent(self.get_wd(cw, os.path.dirname(self.chapter_dir)),
+                                     FakeFlags.DELETE | FakeFlags.ISDIR, 0, '1')],
+        ]
+        with mock.patch.object(watcher, 'flags', FakeFlags, create=True):
+            content_watcher = self.create_mocked_inotify_watcher(events)
+            assert self.get_wd(content_watcher, images_dir) is not None
+
+            assert content_watcher.wait_for_changes() == {images_dir}
+            # the moved directory and its subdirectories are no longer watched
+            assert self.get_wd(content_watcher, images_dir) is None
+            assert self.get_wd(content_watcher, os.path.join(images_dir, 'small')) is None
+            assert content_watcher.inotify.rm_watch.call_count == 2
+
+            assert content_watcher.wait_for_changes() == {self.chapter_dir}
+            assert self.get_wd(content_watcher, self.chapter_dir) is None
+
+    def test_falls_back_to_polling(self):
+        inotify = mock.Mock()
+        inotify.add_watch.side_effect = OSError(28, 'No space left on device')
+        with mock.patch.object(watcher, 'INotify', return_value=inotify), \
+                mock.patch.object(watcher, 'flags', create=True):
+            content_watcher = ContentWatcher([self.temp_dir], batch_delay=0.5, poll_interval=0.1)
+
+        assert content_watcher.inotify is None
+        inotify.close.assert_called_once_with()
+        self.check_batched_changes(content_watcher)
+
+
+if __name__ == '__main__':
+    unittest.main()